@@ -1,4 +1,5 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from .models import Category, Product, ProductImage, Review, Tag, Order, OrderItem
 
@@ -10,9 +11,15 @@ class CategoryAdmin(admin.ModelAdmin):
     search_fields = ['name', 'description']
     list_editable = ['is_active']
     readonly_fields = ['created_at', 'updated_at']
-    
+
+    def get_queryset(self, request):
+        # Đếm sản phẩm bằng annotate để tránh N+1 query trên changelist
+        return super().get_queryset(request).annotate(
+            _product_count=Count('products')
+        )
+
     def product_count(self, obj):
-        return obj.get_product_count()
+        return obj._product_count
     product_count.short_description = 'Số sản phẩm'
 
 
@@ -29,6 +36,9 @@ class ProductAdmin(admin.ModelAdmin):
     list_editable = ['status', 'is_featured', 'stock_quantity']
     readonly_fields = ['rating', 'created_at', 'updated_at']
     prepopulated_fields = {'slug': ('name',)}
+    # Bỏ COUNT(*) toàn bảng của changelist và giảm chi phí cố định mỗi trang
+    show_full_result_count = False
+    list_per_page = 100
     
     fieldsets = (
         ('Thông tin cơ bản', {
@@ -59,6 +69,7 @@ class ProductImageAdmin(admin.ModelAdmin):
     list_display = ['product', 'image_preview', 'is_primary', 'order', 'created_at']
     list_filter = ['is_primary', 'created_at']
     list_editable = ['is_primary', 'order']
+    list_select_related = ('product',)
     search_fields = ['product__name', 'alt_text']
     
     def image_preview(self, obj):
@@ -80,7 +91,9 @@ class ReviewAdmin(admin.ModelAdmin):
     search_fields = ['product__name', 'user__username', 'title', 'comment']
     list_editable = ['is_verified_purchase']
     readonly_fields = ['created_at', 'updated_at']
-    
+    show_full_result_count = False
+    list_per_page = 100
+
     def get_queryset(self, request):
         return super().get_queryset(request).select_related('product', 'user')
 
@@ -99,9 +112,12 @@ class TagAdmin(admin.ModelAdmin):
             obj.color
         )
     color_preview.short_description = 'Màu sắc'
-    
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_counts()
+
     def product_count(self, obj):
-        return obj.get_product_count()
+        return obj._product_count
     product_count.short_description = 'Số sản phẩm'
 
 
@@ -120,6 +136,8 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ['order_number', 'user__username', 'shipping_address']
     list_editable = ['status']
     readonly_fields = ['order_number', 'total_amount', 'created_at', 'updated_at']
+    show_full_result_count = False
+    list_per_page = 100
     inlines = [OrderItemInline]
     
     fieldsets = (
@@ -136,19 +154,19 @@ class OrderAdmin(admin.ModelAdmin):
     )
     
     def items_count(self, obj):
-        return obj.get_items_count()
+        return obj._items_count
     items_count.short_description = 'Số sản phẩm'
-    
+
     def get_queryset(self, request):
-        return super().get_queryset(request).select_related('user')
+        return super().get_queryset(request).select_related('user').annotate(
+            _items_count=Count('items')
+        )
 
 
 @admin.register(OrderItem)
 class OrderItemAdmin(admin.ModelAdmin):
     list_display = ['order', 'product', 'quantity', 'unit_price', 'total_price']
     list_filter = ['order__status']
+    list_select_related = ('order', 'product')
     search_fields = ['order__order_number', 'product__name']
     readonly_fields = ['total_price']
-    
-    def get_queryset(self, request):
-        return super().get_queryset(request).select_related('order', 'product')
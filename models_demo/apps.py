@@ -5,3 +5,6 @@ class ModelsDemoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'models_demo'
     verbose_name = 'Demo Models - Minh họa Model Layer'
+
+    def ready(self):
+        from . import signals  # noqa: F401
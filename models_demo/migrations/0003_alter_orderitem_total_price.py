@@ -0,0 +1,24 @@
+# Generated by Django 5.2.17 on 2026-08-27 10:30
+
+import django.db.models.expressions
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models_demo', '0002_product_prod_status_created_idx_and_more'),
+    ]
+
+    operations = [
+        # GeneratedField không thể AlterField từ cột thường: phải xóa rồi thêm lại
+        migrations.RemoveField(
+            model_name='orderitem',
+            name='total_price',
+        ),
+        migrations.AddField(
+            model_name='orderitem',
+            name='total_price',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.expressions.CombinedExpression(models.F('quantity'), '*', models.F('unit_price')), help_text='Tổng tiền cho sản phẩm này (DB tự tính)', output_field=models.DecimalField(decimal_places=2, max_digits=10)),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.17 on 2026-08-27 10:31
+
+import models_demo.models
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('models_demo', '0003_alter_orderitem_total_price'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='order_number',
+            field=models.CharField(default=models_demo.models.generate_order_number, help_text='Mã đơn hàng', max_length=20, unique=True),
+        ),
+    ]
@@ -1,4 +1,8 @@
-from django.db import models
+import uuid
+import warnings
+
+from django.db import models, transaction
+from django.db.models.functions import Coalesce, Round
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
 
@@ -119,6 +123,10 @@ class Product(models.Model):
             models.Index(fields=['price']),
             models.Index(fields=['rating']),
             models.Index(fields=['is_featured', 'status']),
+            # Index kết hợp khớp với các nhánh filter+sort của product_list
+            models.Index(fields=['status', '-created_at'], name='prod_status_created_idx'),
+            models.Index(fields=['status', 'price'], name='prod_status_price_idx'),
+            models.Index(fields=['status', '-rating'], name='prod_status_rating_idx'),
         ]
         constraints = [
             models.CheckConstraint(
@@ -149,6 +157,24 @@ class Product(models.Model):
     def is_on_sale(self):
         return bool(self.discount_price and self.discount_price < self.price)
 
+    @classmethod
+    def recompute_ratings(cls, product_ids):
+        """Cập nhật lại rating cho một loạt sản phẩm bằng một câu UPDATE
+
+        Dùng sau khi bulk_create/bulk import reviews (kết hợp với
+        Review._skip_rating_update) để thay N câu UPDATE mỗi review
+        bằng một câu duy nhất cho cả batch.
+        """
+        avg_rating = Review.objects.filter(
+            product=models.OuterRef('pk')
+        ).values('product').annotate(
+            avg=Round(models.Avg('rating'), 2)
+        ).values('avg')
+        return cls.objects.filter(pk__in=product_ids).update(
+            # Coalesce để sản phẩm không còn review nào về 0.0 thay vì NULL
+            rating=Coalesce(models.Subquery(avg_rating), 0.0)
+        )
+
 
 class ProductImage(models.Model):
     product = models.ForeignKey(
@@ -196,13 +222,16 @@ class ProductImage(models.Model):
         return f"Hình ảnh của {self.product.name}"
     
     def save(self, *args, **kwargs):
-        if self.is_primary:
-            # Đặt tất cả hình ảnh khác của sản phẩm này thành không phải chính
-            ProductImage.objects.filter(
-                product=self.product,
-                is_primary=True
-            ).exclude(pk=self.pk).update(is_primary=False)
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            if self.is_primary:
+                # Đặt tất cả hình ảnh khác của sản phẩm này thành không phải chính,
+                # trong cùng transaction với save để không có cửa sổ race;
+                # unique_primary_image_per_product chặn trường hợp ghi đua còn lại
+                ProductImage.objects.filter(
+                    product=self.product,
+                    is_primary=True
+                ).exclude(pk=self.pk).update(is_primary=False)
+            super().save(*args, **kwargs)
 
 
 class Review(models.Model):
@@ -254,18 +283,38 @@ class Review(models.Model):
     def __str__(self):
         return f"Đánh giá của {self.user.username} cho {self.product.name}"
     
+    # Đặt True trong lúc bulk import để tắt recompute per-save,
+    # sau đó gọi Product.recompute_ratings(ids) một lần cho cả batch
+    _skip_rating_update = False
+
     def save(self, *args, **kwargs):
         """Override save method để cập nhật rating trung bình của sản phẩm"""
-        super().save(*args, **kwargs)
-        self.update_product_rating()
-    
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if not self._skip_rating_update:
+                self.update_product_rating()
+
     def update_product_rating(self):
-        """Method để cập nhật rating trung bình của sản phẩm"""
-        avg_rating = self.product.reviews.aggregate(
-            avg=models.Avg('rating')
-        )['avg'] or 0.0
-        self.product.rating = round(avg_rating, 2)
-        self.product.save(update_fields=['rating'])
+        """Method để cập nhật rating trung bình của sản phẩm
+
+        Dùng một câu UPDATE với subquery thay vì aggregate rồi save(),
+        tránh thêm một round-trip và race condition giữa hai query.
+        """
+        avg_rating = Review.objects.filter(
+            product=self.product_id
+        ).values('product').annotate(
+            avg=Round(models.Avg('rating'), 2)
+        ).values('avg')
+        Product.objects.filter(pk=self.product_id).update(
+            rating=Coalesce(models.Subquery(avg_rating), 0.0)
+        )
+
+
+class TagQuerySet(models.QuerySet):
+
+    def with_counts(self):
+        """Annotate sẵn số sản phẩm để get_product_count không query thêm"""
+        return self.annotate(_product_count=models.Count('products'))
 
 
 class Tag(models.Model):
@@ -291,7 +340,9 @@ class Tag(models.Model):
         blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
-    
+
+    objects = TagQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
@@ -306,8 +357,25 @@ class Tag(models.Model):
         return self.name
     
     def get_product_count(self):
-        """Instance method để đếm số sản phẩm có tag này"""
-        return self.products.count()
+        """Instance method để đếm số sản phẩm có tag này
+
+        Đọc annotation từ with_counts() nếu có; fallback COUNT per-instance
+        chỉ dành cho instance lẻ, gọi trong vòng lặp sẽ thành N+1.
+        """
+        count = getattr(self, '_product_count', None)
+        if count is None:
+            warnings.warn(
+                "Tag.get_product_count() trên instance chưa annotate sẽ query "
+                "mỗi lần gọi; dùng Tag.objects.with_counts() cho danh sách.",
+                stacklevel=2,
+            )
+            return self.products.count()
+        return count
+
+
+def generate_order_number():
+    """Sinh mã đơn hàng duy nhất, không cần query DB trước khi insert"""
+    return f"ORD-{uuid.uuid4().hex[:12].upper()}"
 
 
 class Order(models.Model):
@@ -323,6 +391,7 @@ class Order(models.Model):
     order_number = models.CharField(
         max_length=20,
         unique=True,
+        default=generate_order_number,
         help_text="Mã đơn hàng"
     )
     user = models.ForeignKey(
@@ -365,8 +434,12 @@ class Order(models.Model):
         return f"Đơn hàng {self.order_number}"
     
     def get_status_display_name(self):
-        """Instance method để lấy tên hiển thị của trạng thái"""
-        return dict(self.ORDER_STATUS_CHOICES)[self.status]
+        """Instance method để lấy tên hiển thị của trạng thái
+
+        Ủy quyền cho get_status_display() của Django (map choices đã được
+        tính sẵn) thay vì dựng lại dict mỗi lần gọi.
+        """
+        return self.get_status_display()
     
     def can_cancel(self):
         """Instance method để kiểm tra có thể hủy đơn hàng không"""
@@ -397,10 +470,11 @@ class OrderItem(models.Model):
         decimal_places=2,
         help_text="Đơn giá tại thời điểm đặt hàng"
     )
-    total_price = models.DecimalField(
-        max_digits=10,
-        decimal_places=2,
-        help_text="Tổng tiền cho sản phẩm này"
+    total_price = models.GeneratedField(
+        expression=models.F('quantity') * models.F('unit_price'),
+        output_field=models.DecimalField(max_digits=10, decimal_places=2),
+        db_persist=True,
+        help_text="Tổng tiền cho sản phẩm này (DB tự tính)"
     )
     
     class Meta:
@@ -413,8 +487,3 @@ class OrderItem(models.Model):
     
     def __str__(self):
         return f"{self.quantity}x {self.product.name} trong đơn hàng {self.order.order_number}"
-    
-    def save(self, *args, **kwargs):
-        """Override save method để tự động tính total_price"""
-        self.total_price = self.quantity * self.unit_price
-        super().save(*args, **kwargs)
@@ -0,0 +1,26 @@
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import Category, Product, Review, Order
+
+# Map model -> các cache key của dashboard cần invalidate khi model thay đổi
+_STATS_KEYS = {
+    Category: ['stats:total_categories'],
+    Product: ['stats:total_products', 'stats:recent_product_ids'],
+    Review: ['stats:total_reviews'],
+    Order: ['stats:total_orders'],
+}
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_save, sender=Review)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Product)
+@receiver(post_delete, sender=Review)
+@receiver(post_delete, sender=Order)
+def invalidate_dashboard_stats(sender, **kwargs):
+    """Xóa cache thống kê dashboard khi dữ liệu nguồn thay đổi"""
+    cache.delete_many(_STATS_KEYS[sender])
@@ -1,17 +1,51 @@
 from django.shortcuts import render, get_object_or_404
-from django.db.models import Count, Avg, Q
-from .models import Category, Product, Review, Tag, Order
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count, Avg, Q, Prefetch, F, Case, When, Value, BooleanField
+from django.db.models.functions import Coalesce
+from .models import Category, Product, ProductImage, Review, Tag, Order
 
 
 def index(request):
+    # Cache danh sách PK 60s rồi fetch theo pk__in: các field mutable
+    # (giá, rating) vẫn tươi, chỉ thứ tự spotlight là stale tối đa 60s
+    recent_ids = cache.get_or_set(
+        'stats:recent_product_ids',
+        lambda: list(
+            Product.objects.filter(status='published')
+            .order_by('-created_at')
+            .values_list('pk', flat=True)[:20]
+        ),
+        60,
+    )
+    recent_batch = sorted(
+        Product.objects.select_related('category')
+        .filter(pk__in=recent_ids)
+        .only(
+            'id', 'name', 'price', 'discount_price', 'rating',
+            'is_featured', 'created_at', 'category__name'
+        ),
+        key=lambda p: p.created_at,
+        reverse=True,
+    )
+    featured_products = [p for p in recent_batch if p.is_featured][:5]
+    top_rated_products = sorted(recent_batch, key=lambda p: p.rating, reverse=True)[:5]
+
+    # Các tổng toàn cục chịu được staleness vài chục giây -> cache thay vì
+    # COUNT(*) mỗi request (xem signals.py cho phần invalidate)
     context = {
-        'total_categories': Category.objects.count(),
-        'total_products': Product.objects.count(),
-        'total_reviews': Review.objects.count(),
-        'total_orders': Order.objects.count(),
-        'featured_products': Product.objects.filter(is_featured=True, status='published')[:5],
-        'recent_products': Product.objects.filter(status='published').order_by('-created_at')[:5],
-        'top_rated_products': Product.objects.filter(status='published').order_by('-rating')[:5],
+        'total_categories': cache.get_or_set(
+            'stats:total_categories', Category.objects.count, 30),
+        'total_products': cache.get_or_set(
+            'stats:total_products', Product.objects.count, 30),
+        'total_reviews': cache.get_or_set(
+            'stats:total_reviews', Review.objects.count, 30),
+        'total_orders': cache.get_or_set(
+            'stats:total_orders', Order.objects.count, 30),
+        'featured_products': featured_products,
+        'recent_products': recent_batch[:5],
+        'top_rated_products': top_rated_products,
     }
     return render(request, 'models_demo/index.html', context)
 
@@ -28,7 +62,23 @@ def category_list(request):
 
 
 def product_list(request):
-    products = Product.objects.select_related('category').filter(status='published')
+    # Prefetch hình ảnh chính và tags để template không query thêm cho từng sản phẩm
+    products = Product.objects.select_related('category').prefetch_related(
+        Prefetch(
+            'images',
+            queryset=ProductImage.objects.filter(is_primary=True),
+            to_attr='primary_images'
+        ),
+        'tags'
+    ).annotate(
+        # Tính sẵn giá cuối và cờ khuyến mãi ở DB thay vì gọi method Python mỗi row
+        final_price=Coalesce('discount_price', 'price'),
+        on_sale=Case(
+            When(discount_price__lt=F('price'), then=Value(True)),
+            default=Value(False),
+            output_field=BooleanField(),
+        ),
+    ).filter(status='published').defer('description')
     
     # Filter theo danh mục
     category_id = request.GET.get('category')
@@ -46,10 +96,17 @@ def product_list(request):
     # Search theo tên
     search_query = request.GET.get('search')
     if search_query:
-        products = products.filter(
-            Q(name__icontains=search_query) | 
-            Q(description__icontains=search_query)
-        )
+        if connection.vendor == 'postgresql':
+            # Full-text search trên Postgres thay cho hai scan ILIKE '%x%'
+            from django.contrib.postgres.search import SearchQuery, SearchVector
+            products = products.annotate(
+                search=SearchVector('name', 'description')
+            ).filter(search=SearchQuery(search_query))
+        else:
+            products = products.filter(
+                Q(name__icontains=search_query) |
+                Q(description__icontains=search_query)
+            )
     
     # Sắp xếp
     sort_by = request.GET.get('sort', '-created_at')
@@ -63,9 +120,13 @@ def product_list(request):
         products = products.order_by('-created_at')
     
     categories = Category.objects.filter(is_active=True)
-    
+
+    # Phân trang để không materialize toàn bộ bảng sản phẩm vào memory
+    page_obj = Paginator(products, 50).get_page(request.GET.get('page'))
+
     context = {
-        'products': products,
+        'products': page_obj,
+        'page_obj': page_obj,
         'categories': categories,
         'current_category': category_id,
         'current_sort': sort_by,
@@ -75,23 +136,52 @@ def product_list(request):
 
 
 def product_detail(request, pk):
-    product = get_object_or_404(Product, pk=pk, status='published')
-    reviews = product.reviews.select_related('user').order_by('-created_at')
+    # Prefetch đánh giá vào product.recent_reviews: một query duy nhất phục
+    # vụ cả đếm lẫn phân trang, template lặp lại list cũng không query thêm.
+    # Vẫn bỏ cột comment TEXT, chỉ lấy các cột hiển thị.
+    product = get_object_or_404(
+        Product.objects.prefetch_related(
+            Prefetch(
+                'reviews',
+                queryset=Review.objects.select_related('user').only(
+                    'id', 'rating', 'title', 'created_at',
+                    'is_verified_purchase', 'product_id', 'user__username'
+                ).order_by('-created_at'),
+                to_attr='recent_reviews'
+            )
+        ),
+        pk=pk,
+        status='published'
+    )
+    reviews_page = Paginator(product.recent_reviews, 20).get_page(request.GET.get('page'))
+    # Chỉ lấy các cột template cần và prefetch hình chính, giảm bytes mỗi row
     related_products = Product.objects.filter(
         category=product.category,
         status='published'
-    ).exclude(pk=pk)[:4]
+    ).exclude(pk=pk).only(
+        'id', 'name', 'slug', 'price', 'discount_price', 'rating'
+    ).prefetch_related(
+        Prefetch(
+            'images',
+            queryset=ProductImage.objects.filter(is_primary=True),
+            to_attr='primary_images'
+        )
+    )[:4]
     
     context = {
         'product': product,
-        'reviews': reviews,
+        'reviews': reviews_page,
+        'page_obj': reviews_page,
         'related_products': related_products,
     }
     return render(request, 'models_demo/product_detail.html', context)
 
 
 def review_list(request):
-    reviews = Review.objects.select_related('product', 'user').order_by('-created_at')
+    # Danh sách không hiển thị nội dung chi tiết -> defer cột TEXT rộng
+    reviews = Review.objects.select_related('product', 'user').defer(
+        'comment'
+    ).order_by('-created_at')
     
     # Filter theo rating
     rating = request.GET.get('rating')
@@ -103,8 +193,11 @@ def review_list(request):
     if verified == 'true':
         reviews = reviews.filter(is_verified_purchase=True)
     
+    page_obj = Paginator(reviews, 50).get_page(request.GET.get('page'))
+
     context = {
-        'reviews': reviews,
+        'reviews': page_obj,
+        'page_obj': page_obj,
         'current_rating': rating,
         'current_verified': verified,
     }
@@ -112,9 +205,7 @@ def review_list(request):
 
 
 def tag_list(request):
-    tags = Tag.objects.annotate(
-        product_count=Count('products')
-    ).order_by('name')
+    tags = Tag.objects.with_counts().order_by('name')
     
     context = {
         'tags': tags,
@@ -127,15 +218,22 @@ def order_list(request):
     if not request.user.is_staff:
         return render(request, 'models_demo/access_denied.html')
     
-    orders = Order.objects.select_related('user').order_by('-created_at')
+    # Projection bằng values(): bảng admin chỉ cần vài cột, không cần
+    # hydrate Order/User instance đầy đủ
+    orders = Order.objects.order_by('-created_at').values(
+        'order_number', 'status', 'total_amount', 'created_at', 'user__username'
+    )
     
     # Filter theo status
     status = request.GET.get('status')
     if status:
         orders = orders.filter(status=status)
     
+    page_obj = Paginator(orders, 50).get_page(request.GET.get('page'))
+
     context = {
-        'orders': orders,
+        'orders': page_obj,
+        'page_obj': page_obj,
         'current_status': status,
     }
     return render(request, 'models_demo/order_list.html', context)